@@ -0,0 +1,69 @@
+"""
+Advisor profile knowledge base on disk
+Shared by the backend and update_backend_profiles.py, so importing it has no side effects
+"""
+
+import os
+import gzip
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping
+
+import orjson
+
+try:
+    import fcntl
+except ImportError:  # Windows: edits are only serialized within one process
+    fcntl = None
+
+
+def resolve_advisors_file() -> Path:
+    """The knowledge base file: ADVISOR_PROFILES_PATH, or advisors.json next to this module.
+    A path ending in .gz names a gzip-compressed copy"""
+    return Path(os.environ.get("ADVISOR_PROFILES_PATH", Path(__file__).parent / "advisors.json"))
+
+
+@contextmanager
+def profiles_file_lock(path: Path) -> Iterator[None]:
+    """Hold the lock every writer of path takes, across processes.
+    It lives in a sidecar file because saves replace path itself"""
+    with open(path.with_name(f".{path.name}.lock"), "ab") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        yield
+
+
+def encode_profiles(profiles: Mapping[str, Any]) -> bytes:
+    """The uncompressed file contents for profiles"""
+    return orjson.dumps(dict(profiles), option=orjson.OPT_INDENT_2) + b"\n"
+
+
+def read_profiles_bytes(path: Path) -> bytes:
+    """The uncompressed contents of the knowledge base file"""
+    raw = path.read_bytes()
+    if path.suffix == ".gz":
+        raw = gzip.decompress(raw)
+    return raw
+
+
+def read_profiles(path: Path) -> Dict[str, Dict[str, str]]:
+    return orjson.loads(read_profiles_bytes(path))
+
+
+def save_profiles(profiles: Mapping[str, Any], path: Path):
+    """Write the profiles to the knowledge base file atomically"""
+    data = encode_profiles(profiles)
+    if path.suffix == ".gz":
+        data = gzip.compress(data)
+
+    # Write beside the target and rename over it, so a crash or a reader
+    # polling mid-save never sees a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -4,14 +4,62 @@ Uses OpenRouter to access GPT-4 or other models for research tasks
 """
 
 import os
+import re
 import json
+import time
+import logging
 import asyncio
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+import sqlite3
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, List, Optional, Any, AsyncIterator, Iterator
+from dataclasses import dataclass, asdict
 from enum import Enum
-import aiohttp
+from functools import lru_cache
+import httpx
+import orjson
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # token counts fall back to a character heuristic
+    tiktoken = None
+
+@lru_cache(maxsize=1)
+def _token_encoder():
+    """BPE encoder, loaded once on first use; None if tiktoken or its encoding data is unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        # Downloads the encoding file on first use, which fails offline
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception as e:
+        logger.warning(f"tiktoken encoder unavailable, estimating tokens from length: {e}")
+        return None
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text, roughly 4 characters each without tiktoken. May block on first use"""
+    encoder = _token_encoder()
+    if encoder is None:
+        return -(-len(text) // 4)
+    return len(encoder.encode(text))
+
+@lru_cache(maxsize=8)
+def _research_body_prefix(model: str) -> bytes:
+    """Encoded research request up to the user message; only the prompt changes per call"""
+    envelope = orjson.dumps({
+        "model": model,
+        "temperature": 0.3,  # Lower temperature for more focused, factual research
+        "max_tokens": 2000,
+        "messages": [{
+            "role": "system",
+            "content": "You are an expert research analyst providing comprehensive, actionable research briefs."
+        }]
+    })
+    return envelope[:-2]  # drop the closing ]}
+
 class ResearchStatus(Enum):
     PROPOSED = "proposed"
     APPROVED = "approved"
@@ -38,16 +86,174 @@ class ResearchRequest:
         if self.created_at is None:
             self.created_at = datetime.now()
 
+
+_DATETIME_FIELDS = ("created_at", "approved_at", "completed_at")
+
+
+def _encode_request(request: ResearchRequest) -> str:
+    """Serialize a research request to a JSON row"""
+    data = asdict(request)
+    data["status"] = request.status.value
+    for field in _DATETIME_FIELDS:
+        if data[field] is not None:
+            data[field] = data[field].isoformat()
+    return json.dumps(data)
+
+
+def _decode_request(text: str) -> ResearchRequest:
+    """Rebuild a research request from its JSON row"""
+    data = json.loads(text)
+    data["status"] = ResearchStatus(data["status"])
+    for field in _DATETIME_FIELDS:
+        if data[field] is not None:
+            data[field] = datetime.fromisoformat(data[field])
+    return ResearchRequest(**data)
+
+
+class ResearchStore(MutableMapping):
+    """
+    Research requests keyed by id, stored in SQLite so they survive restarts
+    and are shared by every worker pointed at the same database file
+    """
+
+    # Requests that will not change again; only the newest finished_limit are kept
+    FINISHED = (ResearchStatus.COMPLETED, ResearchStatus.FAILED, ResearchStatus.DENIED)
+
+    def __init__(self, path: str = ":memory:", finished_limit: int = 256):
+        self.finished_limit = finished_limit
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS research_requests ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        # Listings filter by status, so polling doesn't scan every past request
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS research_requests_status ON research_requests (status, created_at)"
+        )
+
+    def __getitem__(self, request_id: str) -> ResearchRequest:
+        row = self.conn.execute("SELECT data FROM research_requests WHERE id = ?", (request_id,)).fetchone()
+        if row is None:
+            raise KeyError(request_id)
+        return _decode_request(row[0])
+
+    def __setitem__(self, request_id: str, request: ResearchRequest):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO research_requests (id, status, created_at, data) VALUES (?, ?, ?, ?)",
+            (request_id, request.status.value, request.created_at.isoformat(), _encode_request(request))
+        )
+        if self.finished_limit > 0 and request.status in self.FINISHED:
+            self.prune_finished()
+
+    def prune_finished(self):
+        """Drop finished requests beyond the newest finished_limit so history stays bounded"""
+        placeholders = ", ".join("?" * len(self.FINISHED))
+        statuses = [status.value for status in self.FINISHED]
+        self.conn.execute(
+            f"DELETE FROM research_requests WHERE status IN ({placeholders}) AND id NOT IN ("
+            f"SELECT id FROM research_requests WHERE status IN ({placeholders}) ORDER BY created_at DESC LIMIT ?)",
+            [*statuses, *statuses, self.finished_limit]
+        )
+
+    def __delitem__(self, request_id: str):
+        if self.conn.execute("DELETE FROM research_requests WHERE id = ?", (request_id,)).rowcount == 0:
+            raise KeyError(request_id)
+
+    def __iter__(self) -> Iterator[str]:
+        for (request_id,) in self.conn.execute("SELECT id FROM research_requests ORDER BY created_at"):
+            yield request_id
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM research_requests").fetchone()[0]
+
+    def __contains__(self, request_id) -> bool:
+        return self.conn.execute("SELECT 1 FROM research_requests WHERE id = ?", (request_id,)).fetchone() is not None
+
+    def values(self) -> List[ResearchRequest]:
+        """All requests, oldest first, in a single query"""
+        return [_decode_request(data) for (data,) in self.conn.execute("SELECT data FROM research_requests ORDER BY created_at")]
+
+    def with_status(self, *statuses: ResearchStatus) -> List[ResearchRequest]:
+        """Requests in any of the given states, oldest first"""
+        placeholders = ", ".join("?" * len(statuses))
+        rows = self.conn.execute(
+            f"SELECT data FROM research_requests WHERE status IN ({placeholders}) ORDER BY created_at",
+            [status.value for status in statuses]
+        )
+        return [_decode_request(data) for (data,) in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+_WORD = re.compile(r"\w+")
+
+
+class ResearchCache:
+    """
+    Recent research results keyed by the normalized query, so an exact repeat
+    (ignoring case, punctuation and spacing) skips the API call
+    """
+
+    def __init__(self, ttl: float = 3600, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # normalized query -> (expires_at, results)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(_WORD.findall(query.lower()))
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Cached results for this query, if still fresh"""
+        now = time.monotonic()
+        while self._entries and next(iter(self._entries.values()))[0] <= now:
+            self._entries.popitem(last=False)
+
+        entry = self._entries.get(self._normalize(query))
+        return entry[1] if entry is not None else None
+
+    def put(self, query: str, results: Dict[str, Any]):
+        key = self._normalize(query)
+        if not key:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl, results)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
 class ResearchAgent:
     """
     Research Agent that requires human approval before executing any research
     Uses OpenRouter to access GPT-4 or other advanced models
     """
 
-    def __init__(self, openrouter_api_key: str):
+    def __init__(self, openrouter_api_key: str, db_path: str = ":memory:"):
         self.api_key = openrouter_api_key
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.pending_requests: Dict[str, ResearchRequest] = {}
+        self.pending_requests = ResearchStore(db_path, int(os.getenv("RESEARCH_HISTORY_LIMIT", "256")))
+        self.research_cache = ResearchCache(ttl=float(os.getenv("RESEARCH_CACHE_TTL", "3600")))
+
+        # One HTTP/2 connection multiplexes concurrent research calls. Web searches with a
+        # reasoning model can run for minutes, so reads get aiohttp's old 300s budget
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(float(os.getenv("RESEARCH_TIMEOUT", "300")), connect=5.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60),
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": "https://virtual-advisory-board.com",
+                "X-Title": "Virtual Advisory Board Research Agent"
+            }
+        )
+
+        # Caps concurrent research calls so a burst of approvals doesn't overwhelm OpenRouter
+        self._sem = asyncio.Semaphore(int(os.getenv("OPENROUTER_CONCURRENCY", "8")))
 
         # Model configuration - using latest models available on OpenRouter
         # Top tier research models:
@@ -59,6 +265,12 @@ class ResearchAgent:
 
         self.research_model = "openai/gpt-5-nano"  # Using GPT-5 Nano for cost-effective research
         self.cost_per_1k_tokens = 0.008  # Estimate for GPT-5 Nano
+        self._cost_per_token = self.cost_per_1k_tokens / 1000
+
+    async def close(self):
+        """Close the pooled connections and the request store"""
+        await self._client.aclose()
+        self.pending_requests.close()
 
     async def propose_research(
         self,
@@ -79,8 +291,9 @@ class ResearchAgent:
         )
 
         # Estimate the cost
-        estimated_tokens = len(refined_query.split()) * 3  # Rough estimate
-        cost_estimate = (estimated_tokens / 1000) * self.cost_per_1k_tokens
+        # Off the event loop: the first call may load the encoder
+        estimated_tokens = await asyncio.to_thread(count_tokens, refined_query)
+        cost_estimate = estimated_tokens * self._cost_per_token
 
         # Create the request
         request = ResearchRequest(
@@ -126,11 +339,10 @@ class ResearchAgent:
 
         # For now, return a combined version
         # In production, this could use a lighter model to refine
-        refined = f"{query}\n\nSpecific areas to investigate based on advisor input:\n"
-        for suggestion in suggestions:
-            refined += f"- {suggestion['suggestion']}\n"
+        parts = [f"{query}\n\nSpecific areas to investigate based on advisor input:\n"]
+        parts.extend(f"- {suggestion['suggestion']}\n" for suggestion in suggestions)
 
-        return refined
+        return "".join(parts)
 
     def approve_research(self, request_id: str) -> bool:
         """
@@ -145,6 +357,7 @@ class ResearchAgent:
 
         request.status = ResearchStatus.APPROVED
         request.approved_at = datetime.now()
+        self.pending_requests[request_id] = request
         return True
 
     def deny_research(self, request_id: str, reason: Optional[str] = None) -> bool:
@@ -161,12 +374,11 @@ class ResearchAgent:
         request.status = ResearchStatus.DENIED
         if reason:
             request.results = {"denial_reason": reason}
+        self.pending_requests[request_id] = request
         return True
 
-    async def execute_approved_research(self, request_id: str) -> Dict[str, Any]:
-        """
-        Execute research only after human approval
-        """
+    def _start_research(self, request_id: str) -> ResearchRequest:
+        """Move an approved request to in-progress, raising ValueError if it can't run"""
         if request_id not in self.pending_requests:
             raise ValueError(f"Request {request_id} not found")
 
@@ -176,35 +388,85 @@ class ResearchAgent:
             raise ValueError(f"Request {request_id} is not approved. Status: {request.status}")
 
         request.status = ResearchStatus.IN_PROGRESS
+        self.pending_requests[request_id] = request
+        return request
+
+    def _complete_research(self, request: ResearchRequest, research_results: Dict[str, Any]):
+        request.status = ResearchStatus.COMPLETED
+        request.completed_at = datetime.now()
+        request.results = research_results
+        self.pending_requests[request.id] = request
+
+    def _fail_research(self, request: ResearchRequest, error: str):
+        request.status = ResearchStatus.FAILED
+        request.results = {"error": error}
+        self.pending_requests[request.id] = request
+
+    async def execute_approved_research(self, request_id: str) -> Dict[str, Any]:
+        """
+        Execute research only after human approval
+        """
+        request = self._start_research(request_id)
+        started = time.monotonic()
 
         try:
-            # Execute the research using OpenRouter
-            research_results = await self._conduct_research(request.refined_query)
+            # Execute the research using OpenRouter, unless the same question was just researched
+            research_results = self.research_cache.get(request.refined_query)
+            if research_results is None:
+                research_results = await self._conduct_research(request.refined_query)
+                self.research_cache.put(request.refined_query, research_results)
 
-            request.status = ResearchStatus.COMPLETED
-            request.completed_at = datetime.now()
-            request.results = research_results
+            self._complete_research(request, research_results)
 
             return {
                 "status": "success",
                 "request_id": request_id,
                 "results": research_results,
-                "execution_time": (request.completed_at - request.approved_at).total_seconds()
+                "execution_time": time.monotonic() - started
             }
 
         except Exception as e:
-            request.status = ResearchStatus.FAILED
-            request.results = {"error": str(e)}
+            self._fail_research(request, str(e))
             return {
                 "status": "failed",
                 "request_id": request_id,
                 "error": str(e)
             }
 
-    async def _conduct_research(self, query: str) -> Dict[str, Any]:
+    def stream_research(self, request_id: str) -> AsyncIterator[str]:
         """
-        Actually conduct the research using GPT-4 via OpenRouter
+        Execute approved research, yielding the brief as it is generated.
+        The joined text is stored as the request's results once the stream ends.
         """
+        # Validate eagerly so a bad request id is a normal error, not a broken stream
+        request = self._start_research(request_id)
+        return self._stream_research(request)
+
+    async def _stream_research(self, request: ResearchRequest) -> AsyncIterator[str]:
+        try:
+            research_results = self.research_cache.get(request.refined_query)
+            if research_results is not None:
+                yield research_results["research"]
+            else:
+                parts = []
+                usage: Dict[str, Any] = {}
+                async for text in self._stream_research_text(request.refined_query, usage):
+                    parts.append(text)
+                    yield text
+                research_results = self._research_results("".join(parts), usage)
+                self.research_cache.put(request.refined_query, research_results)
+
+            self._complete_research(request, research_results)
+
+        except (asyncio.CancelledError, GeneratorExit):
+            self._fail_research(request, "Research stream was interrupted")
+            raise
+        except Exception as e:
+            self._fail_research(request, str(e))
+            raise
+
+    def _research_body(self, query: str, stream: bool = False) -> bytes:
+        """OpenRouter request body asking for a research brief on query"""
         research_prompt = f"""
         You are a world-class research assistant. Conduct comprehensive research on the following topic:
 
@@ -221,53 +483,62 @@ class ResearchAgent:
         Be specific, cite examples, and provide actionable insights.
         """
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://virtual-advisory-board.com",
-            "X-Title": "Virtual Advisory Board Research Agent"
-        }
+        user_message = orjson.dumps({"role": "user", "content": research_prompt})
+        suffix = b'],"stream":true}' if stream else b"]}"
+        return _research_body_prefix(self.research_model) + b"," + user_message + suffix
 
-        data = {
-            "model": self.research_model,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are an expert research analyst providing comprehensive, actionable research briefs."
-                },
-                {
-                    "role": "user",
-                    "content": research_prompt
-                }
-            ],
-            "temperature": 0.3,  # Lower temperature for more focused, factual research
-            "max_tokens": 2000
+    def _research_results(self, research_content: str, usage: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "research": research_content,
+            "model_used": self.research_model,
+            "timestamp": datetime.now().isoformat(),
+            "tokens_used": usage
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.base_url, headers=headers, json=data) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    research_content = result['choices'][0]['message']['content']
-
-                    return {
-                        "research": research_content,
-                        "model_used": self.research_model,
-                        "timestamp": datetime.now().isoformat(),
-                        "tokens_used": result.get('usage', {})
-                    }
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Research API error: {error_text}")
+    async def _conduct_research(self, query: str) -> Dict[str, Any]:
+        """
+        Actually conduct the research using GPT-4 via OpenRouter
+        """
+        async with self._sem:
+            response = await self._client.post(self.base_url, content=self._research_body(query))
+        if response.status_code == 200:
+            result = response.json()
+            research_content = result['choices'][0]['message']['content']
+            return self._research_results(research_content, result.get('usage', {}))
+        else:
+            raise Exception(f"Research API error: {response.text}")
+
+    async def _stream_research_text(self, query: str, usage: Dict[str, Any]) -> AsyncIterator[str]:
+        """Yield the brief's text as OpenRouter streams it, recording token usage into usage"""
+        body = self._research_body(query, stream=True)
+        async with self._sem, self._client.stream("POST", self.base_url, content=body) as response:
+            if response.status_code != 200:
+                error_text = (await response.aread()).decode(errors="replace")
+                raise Exception(f"Research API error: {error_text}")
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data: ") or line == "data: [DONE]":
+                    continue
+                chunk = json.loads(line[6:])
+                usage.update(chunk.get("usage") or {})
+                for choice in chunk.get("choices", []):
+                    text = (choice.get("delta") or {}).get("content")
+                    if text:
+                        yield text
 
     def get_pending_requests(self) -> List[ResearchRequest]:
         """
         Get all pending research requests awaiting approval
         """
-        return [
-            req for req in self.pending_requests.values()
-            if req.status == ResearchStatus.PROPOSED
-        ]
+        return self.pending_requests.with_status(ResearchStatus.PROPOSED)
+
+    def get_finished_requests(self) -> List[ResearchRequest]:
+        """
+        Get research requests that are done: completed, failed or denied
+        """
+        return self.pending_requests.with_status(
+            ResearchStatus.COMPLETED, ResearchStatus.FAILED, ResearchStatus.DENIED
+        )
 
     def get_request_status(self, request_id: str) -> Optional[ResearchRequest]:
         """
@@ -5,136 +5,148 @@ Consolidates all advisor context from Advisor_Profiles directory
 """
 
 import os
-import json
+import orjson
+from functools import lru_cache
 from pathlib import Path
 
+ADVISOR_PROFILES_DIR = Path("/Volumes/Working_6/Virtiual_Advisory_Board/Advisor_Profiles")
+ADVISORS_DIR = Path("/Volumes/Working_6/Virtiual_Advisory_Board/Advisors")
+
+# Advisor directory name -> backend advisor id
+ADVISOR_MAPPINGS = {
+    "alex_hormozi": "alex",
+    "tony_robbins": "tony",
+    "mark_cuban": "mark",
+    "sara_blakely": "sara",
+    "seth_godin": "seth",
+    "robert_kiyosaki": "robert"
+}
+
+# Profile text file names per advisor, e.g. Alex_Hormozi_Profile.txt or "Alex Hormozi_Profile.txt"
+PROFILE_TEXT_FILES = {
+    full_name: (f"{full_name.title()}_Profile.txt", f"{full_name.title().replace('_', ' ')}_Profile.txt")
+    for full_name in ADVISOR_MAPPINGS
+}
+
+# Consolidated output, reused while it is newer than every source file
+CACHE_FILE = Path("detailed_profiles.json")
+
+def scan_dir(directory):
+    """Map file name to path for one directory in a single scandir pass ({} if it is missing)"""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name: Path(entry.path) for entry in entries}
+    except OSError:
+        return {}
+
+def load_json(path):
+    """Parse a JSON file with orjson"""
+    return orjson.loads(path.read_bytes())
+
+def title_key(key):
+    """speech_patterns -> Speech Patterns"""
+    return key.replace('_', ' ').title()
+
+def render_section(title, data, format_key=str.upper):
+    """Render one structured JSON file as a titled text section of the personality"""
+    parts = [f"\n\n=== {title} ===\n"]
+    if isinstance(data, dict):
+        for key, value in data.items():
+            parts.append(f"\n{format_key(key)}:\n")
+            if isinstance(value, list):
+                parts.extend(f"- {item}\n" for item in value)
+            else:
+                parts.append(f"{value}\n")
+    elif isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict):
+                parts.append(f"\n{item.get('name', 'Framework')}:\n{item.get('description', '')}\n")
+            else:
+                parts.append(f"- {item}\n")
+    else:
+        parts.append(f"{data}\n")
+    return "".join(parts)
+
+# Structured files rendered after the profile text: (file, section title, key format, label for errors)
+PROFILE_SECTIONS = (
+    ("frameworks.json", "KEY FRAMEWORKS", str.upper, "frameworks"),
+    ("speech_patterns.json", "COMMUNICATION STYLE", title_key, "speech patterns"),
+    ("conversation_starters.json", "CONVERSATION APPROACH", title_key, "conversation starters"),
+)
+
+def newest_source_mtime():
+    """Latest modification time under the profile sources, or None if they are missing"""
+    if not ADVISOR_PROFILES_DIR.is_dir():
+        return None
+    mtimes = [ADVISOR_PROFILES_DIR.stat().st_mtime]
+    mtimes.extend(p.stat().st_mtime for p in ADVISOR_PROFILES_DIR.rglob("*"))
+    return max(mtimes)
+
+@lru_cache(maxsize=None)
 def load_advisor_profiles():
-    """Load comprehensive advisor profiles from all available sources"""
+    """Load comprehensive advisor profiles, rebuilding only when a source changed"""
+    source_mtime = newest_source_mtime()
+    if CACHE_FILE.exists() and (source_mtime is None or CACHE_FILE.stat().st_mtime >= source_mtime):
+        print(f"Sources unchanged, using {CACHE_FILE}")
+        return load_json(CACHE_FILE)
+
+    profiles = build_advisor_profiles()
+    CACHE_FILE.write_bytes(orjson.dumps(profiles, option=orjson.OPT_INDENT_2))
+    return profiles
 
-    advisor_profiles_dir = Path("/Volumes/Working_6/Virtiual_Advisory_Board/Advisor_Profiles")
-    advisors_dir = Path("/Volumes/Working_6/Virtiual_Advisory_Board/Advisors")
+def build_advisor_profiles():
+    """Build comprehensive advisor profiles from all available sources"""
+    advisor_profiles_dir = ADVISOR_PROFILES_DIR
 
     profiles = {}
+    profile_entries = scan_dir(advisor_profiles_dir)
 
-    # Advisor ID mappings
-    advisor_mappings = {
-        "alex_hormozi": "alex",
-        "tony_robbins": "tony",
-        "mark_cuban": "mark",
-        "sara_blakely": "sara",
-        "seth_godin": "seth",
-        "robert_kiyosaki": "robert"
-    }
-
-    for full_name, short_id in advisor_mappings.items():
+    for full_name, short_id in ADVISOR_MAPPINGS.items():
         profile_data = {
             "name": "",
             "description": "",
             "personality": ""
         }
 
-        # Load main profile text file
-        profile_file = advisor_profiles_dir / f"{full_name.replace('_', '_').title().replace('_', '_')}_Profile.txt"
-        alt_profile_file = advisor_profiles_dir / f"{full_name.title().replace('_', ' ')}_Profile.txt"
-
+        # Load main profile text file, trying each naming pattern
         profile_text = ""
-
-        # Try different naming patterns
-        for pf in [profile_file, alt_profile_file]:
-            if pf.exists():
+        for profile_name in PROFILE_TEXT_FILES[full_name]:
+            pf = profile_entries.get(profile_name)
+            if pf:
                 try:
-                    with open(pf, 'r', encoding='utf-8') as f:
-                        profile_text = f.read().strip()
-                        break
+                    profile_text = pf.read_text(encoding='utf-8').strip()
+                    break
                 except Exception as e:
                     print(f"Error reading {pf}: {e}")
 
         # Load structured data from directory
-        advisor_dir = advisor_profiles_dir / full_name
-        if advisor_dir.exists():
+        advisor_files = scan_dir(advisor_profiles_dir / full_name) if full_name in profile_entries else {}
+        if advisor_files:
             print(f"Loading structured data for {full_name}")
 
             # Load core profile
-            core_file = advisor_dir / "core_profile.json"
-            if core_file.exists():
+            core_file = advisor_files.get("core_profile.json")
+            if core_file:
                 try:
-                    with open(core_file, 'r') as f:
-                        core_data = json.load(f)
-                        if 'name' in core_data:
-                            profile_data['name'] = core_data['name']
-                        if 'description' in core_data:
-                            profile_data['description'] = core_data['description']
+                    core_data = load_json(core_file)
+                    if 'name' in core_data:
+                        profile_data['name'] = core_data['name']
+                    if 'description' in core_data:
+                        profile_data['description'] = core_data['description']
                 except Exception as e:
                     print(f"Error loading core profile for {full_name}: {e}")
 
-            # Load frameworks
-            frameworks_file = advisor_dir / "frameworks.json"
-            frameworks_text = ""
-            if frameworks_file.exists():
-                try:
-                    with open(frameworks_file, 'r') as f:
-                        frameworks_data = json.load(f)
-                        frameworks_text = "\n\n=== KEY FRAMEWORKS ===\n"
-                        if isinstance(frameworks_data, dict):
-                            for key, value in frameworks_data.items():
-                                frameworks_text += f"\n{key.upper()}:\n"
-                                if isinstance(value, list):
-                                    for item in value:
-                                        frameworks_text += f"- {item}\n"
-                                else:
-                                    frameworks_text += f"{value}\n"
-                        elif isinstance(frameworks_data, list):
-                            for framework in frameworks_data:
-                                if isinstance(framework, dict):
-                                    frameworks_text += f"\n{framework.get('name', 'Framework')}:\n{framework.get('description', '')}\n"
-                                else:
-                                    frameworks_text += f"- {framework}\n"
-                except Exception as e:
-                    print(f"Error loading frameworks for {full_name}: {e}")
-
-            # Load speech patterns
-            speech_file = advisor_dir / "speech_patterns.json"
-            speech_text = ""
-            if speech_file.exists():
-                try:
-                    with open(speech_file, 'r') as f:
-                        speech_data = json.load(f)
-                        speech_text = "\n\n=== COMMUNICATION STYLE ===\n"
-                        if isinstance(speech_data, dict):
-                            for key, value in speech_data.items():
-                                speech_text += f"\n{key.replace('_', ' ').title()}:\n"
-                                if isinstance(value, list):
-                                    for item in value:
-                                        speech_text += f"- {item}\n"
-                                else:
-                                    speech_text += f"{value}\n"
-                except Exception as e:
-                    print(f"Error loading speech patterns for {full_name}: {e}")
-
-            # Load conversation starters
-            conversation_file = advisor_dir / "conversation_starters.json"
-            conversation_text = ""
-            if conversation_file.exists():
-                try:
-                    with open(conversation_file, 'r') as f:
-                        conversation_data = json.load(f)
-                        conversation_text = "\n\n=== CONVERSATION APPROACH ===\n"
-                        if isinstance(conversation_data, dict):
-                            for key, value in conversation_data.items():
-                                conversation_text += f"\n{key.replace('_', ' ').title()}:\n"
-                                if isinstance(value, list):
-                                    for item in value:
-                                        conversation_text += f"- {item}\n"
-                                else:
-                                    conversation_text += f"{value}\n"
-                        elif isinstance(conversation_data, list):
-                            for starter in conversation_data:
-                                conversation_text += f"- {starter}\n"
-                except Exception as e:
-                    print(f"Error loading conversation starters for {full_name}: {e}")
+            # Render the structured sections after the profile text
+            section_texts = []
+            for file_name, title, format_key, label in PROFILE_SECTIONS:
+                section_file = advisor_files.get(file_name)
+                if section_file:
+                    try:
+                        section_texts.append(render_section(title, load_json(section_file), format_key))
+                    except Exception as e:
+                        print(f"Error loading {label} for {full_name}: {e}")
 
-            # Combine all text
-            combined_text = profile_text + frameworks_text + speech_text + conversation_text
+            combined_text = profile_text + "".join(section_texts)
 
         else:
             # Fallback to just profile text
@@ -197,8 +209,4 @@ if __name__ == "__main__":
     for advisor_id, profile in profiles.items():
         print(f"  {advisor_id}: {profile['name']} - {len(profile['personality'])} characters of context")
 
-    # Save to JSON for inspection
-    with open("detailed_profiles.json", "w") as f:
-        json.dump(profiles, f, indent=2)
-
-    print("\nDetailed profiles saved to detailed_profiles.json")
\ No newline at end of file
+    print(f"\nDetailed profiles saved to {CACHE_FILE}")
\ No newline at end of file
@@ -4,6 +4,7 @@ Virtual Advisory Board MCP Server
 Provides Claude Desktop access to all advisors through MCP protocol
 """
 
+import os
 import json
 import logging
 import asyncio
@@ -24,14 +25,18 @@ logger = logging.getLogger(__name__)
 # Import our unified backend
 import sys
 sys.path.append(str(Path(__file__).parent / "backend"))
-from app import ADVISOR_PROFILES, OpenRouterClient
+from app import ADVISOR_PROFILES, CHAT_CACHE_SIZE, CHAT_CACHE_TTL, PANEL_SYSTEM_MESSAGES, OpenRouterClient
 
 class VirtualAdvisoryBoardMCP:
     """MCP Server for Virtual Advisory Board system"""
 
     def __init__(self):
         self.server = Server("virtual-advisory-board")
-        self.openrouter = OpenRouterClient()
+        # Repeated chats and panels on the same topic reuse the earlier completion
+        self.openrouter = OpenRouterClient(cache_size=CHAT_CACHE_SIZE, cache_ttl=CHAT_CACHE_TTL)
+
+        # Caps concurrent panel calls so large panels don't trip OpenRouter rate limits
+        self._sem = asyncio.Semaphore(int(os.getenv("OPENROUTER_CONCURRENCY", "8")))
 
         # Setup tool handlers
         self._setup_tools()
@@ -89,6 +94,11 @@ class VirtualAdvisoryBoardMCP:
                             "description": "List of advisor IDs to include (optional - defaults to all)",
                             "items": {"type": "string"},
                             "default": None
+                        },
+                        "fused": {
+                            "type": "boolean",
+                            "description": "Answer for every advisor in a single model call - faster and cheaper, but the voices are less distinct",
+                            "default": False
                         }
                     },
                     "required": ["topic"]
@@ -154,17 +164,21 @@ class VirtualAdvisoryBoardMCP:
         # Build conversation context
         context_text = ""
         if context:
-            context_text = "Recent conversation:\n"
-            for msg in context[-3:]:  # Last 3 messages
-                context_text += f"User: {msg.get('user', '')}\n"
-                context_text += f"{profile['name']}: {msg.get('advisor', '')}\n"
+            name = profile["name"]
+            context_text = "Recent conversation:\n" + "".join(
+                f"User: {msg.get('user', '')}\n{name}: {msg.get('advisor', '')}\n"
+                for msg in context[-3:]  # Last 3 messages
+            )
 
-        # Build system prompt
-        system_prompt = f"{profile['personality']}\n\n{context_text}"
+        # The personality leads unchanged so the provider can reuse its cached prefix
+        messages = [{"role": "system", "content": profile["personality"]}]
+        if context_text:
+            messages.append({"role": "system", "content": context_text})
+        messages.append({"role": "user", "content": message})
 
         try:
             # Get AI response
-            response_text = await self.openrouter.complete(system_prompt, message)
+            response_text = await self.openrouter.complete_messages(messages)
 
             return [types.TextContent(
                 type="text",
@@ -192,21 +206,15 @@ class VirtualAdvisoryBoardMCP:
                 text=f"Invalid advisors: {', '.join(invalid_advisors)}. Available: {', '.join(ADVISOR_PROFILES.keys())}"
             )]
 
-        responses = []
+        responses = None
+        if arguments.get("fused"):
+            responses = await self._ask_fused(selected_advisors, topic)
 
-        # Get responses from each advisor
-        for advisor_id in selected_advisors:
-            profile = ADVISOR_PROFILES[advisor_id]
-
-            system_prompt = f"{profile['personality']}\n\nYou are participating in a panel discussion on: {topic}\n\nProvide your perspective on this topic."
-
-            try:
-                response_text = await self.openrouter.complete(system_prompt, topic)
-                responses.append(f"**{profile['name']}:** {response_text}")
-
-            except Exception as e:
-                logger.error(f"Panel discussion error for {advisor_id}: {e}")
-                responses.append(f"**{profile['name']}:** [Error getting response]")
+        if responses is None:
+            # Ask every advisor at once; one failure only affects its own entry
+            responses = await asyncio.gather(
+                *[self._ask_one(advisor_id, topic) for advisor_id in selected_advisors]
+            )
 
         # Format panel discussion
         result = f"# Panel Discussion: {topic}\n\n" + "\n\n---\n\n".join(responses)
@@ -216,6 +224,65 @@ class VirtualAdvisoryBoardMCP:
             text=result
         )]
 
+    async def _ask_one(self, advisor_id: str, topic: str) -> str:
+        """One advisor's formatted panel response"""
+        profile = ADVISOR_PROFILES[advisor_id]
+
+        messages = PANEL_SYSTEM_MESSAGES[advisor_id] + [{"role": "user", "content": topic}]
+
+        try:
+            async with self._sem:
+                response_text = await self.openrouter.complete_messages(messages)
+            return f"**{profile['name']}:** {response_text}"
+
+        except Exception as e:
+            logger.error(f"Panel discussion error for {advisor_id}: {e}")
+            return f"**{profile['name']}:** [Error getting response]"
+
+    async def _ask_fused(self, advisor_ids: List[str], topic: str) -> Optional[List[str]]:
+        """Every advisor's formatted panel response from one model call, or None if the reply is unusable"""
+        personas = "\n\n".join(
+            f"=== {advisor_id}: {ADVISOR_PROFILES[advisor_id]['name']} ===\n{ADVISOR_PROFILES[advisor_id]['personality']}"
+            for advisor_id in advisor_ids
+        )
+        system_prompt = (
+            "You are running a panel discussion and speak for each of the advisors below in turn, "
+            "each in their own voice and from their own perspective.\n\n"
+            f"{personas}\n\n"
+            'Reply with only a JSON object of the form {"responses": [{"advisor": "<id>", "text": "<response>"}]}, '
+            f"with one entry per advisor in this order: {', '.join(advisor_ids)}."
+        )
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": topic}
+        ]
+
+        try:
+            async with self._sem:
+                reply = await self.openrouter.complete_messages(messages, max_tokens=600 * len(advisor_ids))
+            # Models sometimes wrap the object in prose or a code fence
+            parsed = json.loads(reply[reply.index("{"):reply.rindex("}") + 1])
+            texts = {
+                entry["advisor"]: entry["text"]
+                for entry in parsed["responses"]
+                if isinstance(entry, dict) and isinstance(entry.get("text"), str)
+            }
+        except Exception as e:
+            logger.warning(f"Fused panel failed, asking advisors separately: {e}")
+            return None
+
+        # Ask any advisor the model left out on their own, as the parallel path would
+        missing = [advisor_id for advisor_id in advisor_ids if advisor_id not in texts]
+        if missing:
+            logger.warning(f"Fused panel reply missed {', '.join(missing)}, asking them separately")
+        separate = dict(zip(missing, await asyncio.gather(*[self._ask_one(advisor_id, topic) for advisor_id in missing])))
+
+        return [
+            separate[advisor_id] if advisor_id in separate
+            else f"**{ADVISOR_PROFILES[advisor_id]['name']}:** {texts[advisor_id]}"
+            for advisor_id in advisor_ids
+        ]
+
     async def _list_advisors(self) -> List[types.TextContent]:
         """List all available advisors"""
 
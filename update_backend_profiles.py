@@ -1,76 +1,59 @@
 #!/usr/bin/env python3
 """
 Update Backend with Comprehensive Advisor Profiles
-Replaces basic profiles in app.py with detailed, rich profiles
+Replaces basic profiles in backend/advisors.json with detailed, rich profiles
 """
 
-import json
+import sys
+import orjson
 from pathlib import Path
+from dotenv import load_dotenv
 
-def update_backend_profiles():
-    """Update the backend app.py with comprehensive advisor profiles"""
-
-    # Load the detailed profiles
-    with open("detailed_profiles.json", "r") as f:
-        detailed_profiles = json.load(f)
-
-    # Read the current app.py
-    app_path = Path("backend/app.py")
-    with open(app_path, "r") as f:
-        app_content = f.read()
-
-    # Find the ADVISOR_PROFILES section
-    start_marker = "ADVISOR_PROFILES = {"
-    end_marker = "}"
-
-    start_idx = app_content.find(start_marker)
-    if start_idx == -1:
-        print("Could not find ADVISOR_PROFILES in app.py")
-        return False
-
-    # Find the end of the ADVISOR_PROFILES dict by counting braces
-    brace_count = 0
-    current_idx = start_idx + len(start_marker) - 1  # Start at the opening brace
-    end_idx = current_idx
+# Resolve, lock and write the knowledge base exactly as the backend does
+sys.path.append(str(Path(__file__).parent / "backend"))
+from profile_store import encode_profiles, profiles_file_lock, read_profiles_bytes, resolve_advisors_file, save_profiles
 
-    for i, char in enumerate(app_content[current_idx:], current_idx):
-        if char == '{':
-            brace_count += 1
-        elif char == '}':
-            brace_count -= 1
-            if brace_count == 0:
-                end_idx = i + 1
-                break
+# The fields the backend serves for each advisor
+BACKEND_FIELDS = ("name", "description", "personality")
 
-    # Build the new ADVISOR_PROFILES section
-    new_profiles_section = "ADVISOR_PROFILES = {\n"
-
-    for advisor_id, profile in detailed_profiles.items():
-        # Properly escape the personality string for Python
-        personality_escaped = repr(profile["personality"])
-
-        new_profiles_section += f'''    "{advisor_id}": {{
-        "name": "{profile["name"]}",
-        "description": "{profile["description"]}",
-        "personality": {personality_escaped}
-    }},
-
-'''
-
-    new_profiles_section = new_profiles_section.rstrip(",\n") + "\n}"
+def update_backend_profiles():
+    """Update the backend advisors.json with comprehensive advisor profiles"""
 
-    # Replace the old section with the new one
-    new_app_content = app_content[:start_idx] + new_profiles_section + app_content[end_idx:]
+    # ADVISOR_PROFILES_PATH may come from the same .env the backend reads
+    load_dotenv()
 
-    # Write back to app.py
-    with open(app_path, "w") as f:
-        f.write(new_app_content)
+    # Load the detailed profiles
+    detailed_profiles = orjson.loads(Path("detailed_profiles.json").read_bytes())
 
-    print("✅ Successfully updated backend/app.py with comprehensive advisor profiles")
-    print(f"   - {len(detailed_profiles)} advisors updated")
+    profiles_path = resolve_advisors_file()
+    if not profiles_path.parent.exists():
+        print(f"Could not find {profiles_path.parent}")
+        return False
 
-    for advisor_id, profile in detailed_profiles.items():
-        print(f"   - {advisor_id}: {profile['name']} ({len(profile['personality'])} characters)")
+    # Keep only the fields the backend serves
+    backend_profiles = {
+        advisor_id: {field: profile[field] for field in BACKEND_FIELDS}
+        for advisor_id, profile in detailed_profiles.items()
+    }
+
+    # Hold the lock the backend takes for admin edits, so neither overwrites the other
+    with profiles_file_lock(profiles_path):
+        # Leave the file untouched when nothing changed, so running servers don't reload it
+        if profiles_path.exists() and read_profiles_bytes(profiles_path) == encode_profiles(backend_profiles):
+            print(f"✅ {profiles_path} is already up to date")
+            return True
+
+        save_profiles(backend_profiles, profiles_path)
+
+    summary = [
+        f"✅ Successfully updated {profiles_path} with comprehensive advisor profiles",
+        f"   - {len(backend_profiles)} advisors updated"
+    ]
+    summary.extend(
+        f"   - {advisor_id}: {profile['name']} ({len(profile['personality'])} characters)"
+        for advisor_id, profile in backend_profiles.items()
+    )
+    print("\n".join(summary))
 
     return True
 
@@ -81,4 +64,4 @@ if __name__ == "__main__":
         print("\n🎉 Backend successfully updated with your detailed advisor context!")
         print("The advisors now have their full personalities, frameworks, and knowledge.")
     else:
-        print("\n❌ Failed to update backend")
\ No newline at end of file
+        print("\n❌ Failed to update backend")